@@ -6,15 +6,239 @@ NOTE: This example does NOT use the Bridge Agent WebSocket API.
       For Bridge Agent examples, see examples/agent/bridge-executor/
 """
 
+import atexit
 import os
+import re
+import select
+import signal
+import struct
 import sys
+import threading
+import time
 import requests
-import re
 import subprocess
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configuration (can be overridden via environment variables)
 SERVER_URL = os.environ.get("SWITCHAI_URL", "http://localhost:8081/v1/chat/completions")
 MODEL = os.environ.get("SWITCHAI_MODEL", "gemini-2.5-flash")
+# Opt-in: set to 1 to run snippets in the warm worker instead of a fresh interpreter
+INPROC_EXEC = os.environ.get("SWITCHAI_INPROC_EXEC", "0") == "1"
+
+# One pooled session per process so repeated calls reuse the keep-alive connection
+_SESSION = requests.Session()
+_SESSION.headers.update({"Connection": "keep-alive", "Content-Type": "application/json"})
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    # ask_llm only POSTs, which urllib3 does not retry on status by default.
+    # read=False: a POST that timed out may still be generating, so never resend it.
+    max_retries=Retry(
+        total=2,
+        read=False,
+        backoff_factor=0.1,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        raise_on_status=False,
+    ),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
+# Source of the warm sandbox worker. It pre-imports common modules once, then
+# reads length-prefixed snippets on stdin, runs each in a forked child (so
+# snippets cannot see each other's state) and replies with exit status,
+# stdout and stderr. Code objects are cached by SHA-256 of the source and
+# compiled before forking, so a retried snippet skips compilation.
+_WORKER_SOURCE = r'''
+import hashlib, os, resource, selectors, struct, sys, traceback, types
+import collections, itertools, json, math, random, re
+
+CODE_CACHE = {}
+
+def read_exact(stream, n):
+    data = stream.read(n)
+    return data if len(data) == n else None
+
+def compile_cached(source):
+    digest = hashlib.sha256(source).digest()
+    code = CODE_CACHE.get(digest)
+    if code is None:
+        try:
+            code = compile(source, "<string>", "exec")
+        except (SyntaxError, ValueError):
+            return None  # recompiled in the child to report the error
+        if len(CODE_CACHE) >= 128:
+            CODE_CACHE.clear()
+        CODE_CACHE[digest] = code
+    return code
+
+def run(source, cpu_limit):
+    code = compile_cached(source)
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_r)
+        os.close(err_r)
+        os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+        os.dup2(out_w, 1)
+        os.dup2(err_w, 2)
+        sys.stdin = open(os.devnull)
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+        # A fresh __main__ module, so pickle and multiprocessing can find
+        # classes and functions the snippet defines
+        main = types.ModuleType("__main__")
+        sys.modules["__main__"] = main
+        try:
+            if code is None:
+                code = compile(source, "<string>", "exec")
+            exec(code, main.__dict__)
+            status = 0
+        except SystemExit as e:
+            status = e.code
+        except BaseException as e:
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            status = 1
+        if status is None:
+            status = 0
+        elif not isinstance(status, int):
+            print(status, file=sys.stderr)
+            status = 1
+        # Leave through normal interpreter shutdown, as python -c does:
+        # non-daemon threads are joined and atexit handlers run
+        sys.exit(status & 0xFF)
+    os.close(out_w)
+    os.close(err_w)
+    chunks = {out_r: [], err_r: []}
+    sel = selectors.DefaultSelector()
+    for fd in chunks:
+        sel.register(fd, selectors.EVENT_READ)
+    while sel.get_map():
+        for key, _ in sel.select():
+            data = os.read(key.fd, 65536)
+            if data:
+                chunks[key.fd].append(data)
+            else:
+                sel.unregister(key.fd)
+                os.close(key.fd)
+    _, st = os.waitpid(pid, 0)
+    status = os.WEXITSTATUS(st) if os.WIFEXITED(st) else -os.WTERMSIG(st)
+    return status, b"".join(chunks[out_r]), b"".join(chunks[err_r])
+
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+while True:
+    header = read_exact(stdin, 8)
+    if header is None:
+        break
+    size, cpu_limit = struct.unpack(">II", header)
+    status, out, err = run(read_exact(stdin, size), cpu_limit)
+    stdout.write(struct.pack(">iII", status, len(out), len(err)) + out + err)
+    stdout.flush()
+'''
+
+_WORKER = None
+_WORKER_LOCK = threading.Lock()
+
+
+def _stop_worker():
+    """Kills the sandbox worker together with any snippet it is running."""
+    global _WORKER
+    if _WORKER is not None:
+        try:
+            os.killpg(_WORKER.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        _WORKER.wait()
+        _WORKER.stdin.close()
+        _WORKER.stdout.close()
+        _WORKER = None
+
+
+def _read_exact(fd, n, deadline):
+    """Reads n bytes from the worker, raising TimeoutError past the deadline."""
+    buf = bytearray()
+    while len(buf) < n:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+            raise TimeoutError
+        data = os.read(fd, n - len(buf))
+        if not data:
+            raise EOFError("sandbox worker exited unexpectedly")
+        buf += data
+    return bytes(buf)
+
+
+def _run_in_worker(code, timeout):
+    """Runs a snippet in the warm worker, starting it on first use."""
+    global _WORKER
+    if _WORKER is None or _WORKER.poll() is not None:
+        # Spawned once, in its own session so a runaway snippet can be killed
+        # along with the worker; the posix_spawn fast path does not matter here.
+        _WORKER = subprocess.Popen(
+            [sys.executable, "-u", "-c", _WORKER_SOURCE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+            start_new_session=True
+        )
+    args = [sys.executable, "-c", code]
+    data = code.encode()
+    try:
+        # Backstop CPU cap just above the timeout, in case we are not around to kill it
+        _WORKER.stdin.write(struct.pack(">II", len(data), int(timeout) + 1) + data)
+        deadline = time.monotonic() + timeout
+        fd = _WORKER.stdout.fileno()
+        status, out_len, err_len = struct.unpack(">iII", _read_exact(fd, 12, deadline))
+        out = _read_exact(fd, out_len, deadline)
+        err = _read_exact(fd, err_len, deadline)
+    except BaseException as e:
+        # Timed out or crashed mid-reply: the worker's state is unknown
+        _stop_worker()
+        if isinstance(e, TimeoutError):
+            raise subprocess.TimeoutExpired(args, timeout) from None
+        raise
+    return subprocess.CompletedProcess(
+        args, status,
+        out.decode(errors="replace"), err.decode(errors="replace")
+    )
+
+
+# Worker children get /dev/null as stdin, so snippets that read it (input(),
+# sys.stdin, getpass, fileinput) run in a fresh interpreter on the terminal.
+_READS_STDIN_RE = re.compile(r"\binput\s*\(|\bstdin\b|\bgetpass\b|\bfileinput\b")
+
+def _run_code(code, timeout=30):
+    """Runs a snippet in the warm worker, or a fresh interpreter if it is busy, unsupported or reads stdin."""
+    if (INPROC_EXEC and hasattr(os, "fork") and not _READS_STDIN_RE.search(code)
+            and _WORKER_LOCK.acquire(blocking=False)):
+        try:
+            return _run_in_worker(code, timeout)
+        finally:
+            _WORKER_LOCK.release()
+
+    # Keep this call eligible for posix_spawn (Python 3.8+): no preexec_fn,
+    # cwd or start_new_session, and close_fds=False. Any of those silently
+    # falls back to fork+exec, which copies the parent's page tables.
+    # Python's own fds are non-inheritable (PEP 446), so none leak.
+    return subprocess.run(
+        [sys.executable, "-c", code], 
+        capture_output=True, 
+        text=True, 
+        timeout=timeout,
+        close_fds=False
+    )
+
+
+def close():
+    """Closes the pooled HTTP session and stops the sandbox worker."""
+    _SESSION.close()
+    _stop_worker()
+
+
+atexit.register(close)
 
 def ask_llm(task):
     """Asks the LLM to write a Python script for the task."""
@@ -41,19 +265,66 @@ def ask_llm(task):
     }
 
     try:
-        response = requests.post(SERVER_URL, json=payload, timeout=60)
+        response = _SESSION.post(SERVER_URL, json=payload, timeout=60)
         response.raise_for_status()
         return response.json()['choices'][0]['message']['content']
     except requests.exceptions.RequestException as e:
         print(f"❌ Error communicating with switchAILocal: {e}")
         sys.exit(1)
 
+# Fence info strings accepted as Python (compared lowercased): ```python, ```Python, ```python3
+_PYTHON_FENCES = ("python", "python3")
+
+def _find_closing_fence(text, start):
+    """Returns (body_end, resume) for the first closing ``` fence after start, or None."""
+    i = text.find("```", start)
+    while i != -1:
+        line_start = text.rfind("\n", start, i) + 1
+        eol = text.find("\n", i)
+        if eol == -1:
+            eol = len(text)
+        # A closing fence starts its line; text may follow it, but an info
+        # string glued to the backticks (```python) is an opener, i.e. content
+        after = text[i:eol].lstrip("`")
+        if not text[line_start:i].strip(" \t") and after[:1] in ("", " ", "\t", "\r"):
+            return line_start - 1, eol
+        i = text.find("```", eol)
+    return None
+
+def _iter_fenced_blocks(text, lang_whitelist, anchored=True):
+    """
+    Yields (lang, body) for each fenced block whose info string is in lang_whitelist.
+
+    Walks the text once, jumping between fences with str.find. When anchored,
+    only backticks that open a line count as an opening fence, so ``` inside
+    quoted strings or inline code is ignored. Non-whitelisted blocks are
+    skipped as a whole.
+    """
+    i = text.find("```")
+    while i != -1:
+        line_start = text.rfind("\n", 0, i) + 1
+        if anchored and text[line_start:i].strip(" \t"):
+            i = text.find("```", i + 3)
+            continue
+        eol = text.find("\n", i)
+        if eol == -1:
+            return
+        fence = _find_closing_fence(text, eol)
+        if fence is None:
+            return
+        body_end, resume = fence
+        lang = text[i + 3:eol].strip().lower()
+        if lang in lang_whitelist:
+            yield lang, text[eol + 1:body_end]
+        i = text.find("```", resume)
+
 def extract_code(llm_response):
     """Extracts python code block from response."""
-    # Flexible pattern: handles ```python, ```Python, ```python3, etc.
-    match = re.search(r"```[Pp]ython[3]?\s*\n(.*?)\n```", llm_response, re.DOTALL)
-    if match:
-        return match.group(1)
+    for _, code in _iter_fenced_blocks(llm_response, _PYTHON_FENCES):
+        return code
+    # Free-form replies sometimes open the fence mid-line ("Sure! ```python")
+    for _, code in _iter_fenced_blocks(llm_response, _PYTHON_FENCES, anchored=False):
+        return code
     return None
 
 def execute_code(code):
@@ -70,12 +341,7 @@ def execute_code(code):
 
     print("\n🚀 Executing...")
     try:
-        result = subprocess.run(
-            [sys.executable, "-c", code], 
-            capture_output=True, 
-            text=True, 
-            timeout=30
-        )
+        result = _run_code(code)
         print("✅ Output:")
         print(result.stdout)
         if result.stderr:
@@ -93,6 +359,7 @@ def main():
         print("\nEnvironment Variables:")
         print("  SWITCHAI_URL   - API endpoint (default: http://localhost:8081/v1/chat/completions)")
         print("  SWITCHAI_MODEL - Model to use (default: gemini-2.5-flash)")
+        print("  SWITCHAI_INPROC_EXEC - Set to 1 to run code in the warm worker (default: 0, fresh interpreter)")
         sys.exit(1)
 
     task = sys.argv[1]
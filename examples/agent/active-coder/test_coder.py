@@ -0,0 +1,75 @@
+"""
+Checks that the warm sandbox worker runs snippets like 'python -c' does.
+
+Run with: python -m unittest test_coder
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+
+import coder
+
+SNIPPETS = {
+    "non-daemon thread": """
+        import threading, time
+        def work():
+            time.sleep(0.2)
+            print("thread-done")
+        threading.Thread(target=work).start()
+        print("main")
+    """,
+    "atexit": """
+        import atexit
+        atexit.register(print, "at-exit")
+        print("main")
+    """,
+    "pickle": """
+        import pickle
+        class A:
+            pass
+        print(type(pickle.loads(pickle.dumps(A()))).__name__)
+    """,
+    "multiprocessing": """
+        from multiprocessing import Pool
+        def square(x):
+            return x * x
+        with Pool(2) as pool:
+            print(pool.map(square, range(4)))
+    """,
+    "exception": """
+        print("before")
+        raise ValueError("boom")
+    """,
+    "exit status": """
+        import sys
+        print("bye")
+        sys.exit(3)
+    """,
+}
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "the warm worker needs fork()")
+class WorkerMatchesPythonC(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        coder.close()
+
+    def test_snippets(self):
+        for name, snippet in SNIPPETS.items():
+            code = textwrap.dedent(snippet)
+            with self.subTest(name):
+                expected = subprocess.run(
+                    [sys.executable, "-c", code], capture_output=True, text=True, timeout=30
+                )
+                got = coder._run_in_worker(code, 30)
+                self.assertEqual(
+                    (got.returncode, got.stdout, got.stderr),
+                    (expected.returncode, expected.stdout, expected.stderr),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
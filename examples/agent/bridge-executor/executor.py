@@ -11,83 +11,216 @@ import uuid
 import sys
 import websockets
 
+# orjson is an optional, faster drop-in for the per-frame JSON work
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    def _dumps_pretty(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+    def _dumps_pretty(obj):
+        return json.dumps(obj, indent=2)
+
 # Configuration
 WS_URL = "ws://localhost:8081/ws"
 PROVIDER = "bridge"  # The provider identifier for bridge agent sessions
+REQUEST_TIMEOUT = 30  # Seconds per request, covering every frame of a stream
+FLUSH_INTERVAL = 0.016  # Seconds between console flushes while streaming
+FLUSH_SIZE = 4096  # Buffered characters that force an immediate flush
 
-async def execute_http_request(method: str, url: str, body: dict = None):
+class _ChunkWriter:
     """
-    Sends an HTTP request through the switchAILocal WebSocket relay.
-    
-    This demonstrates how agentic clients can use switchAILocal as a unified
-    gateway - sending requests through WebSocket instead of direct HTTP.
+    Coalesces streamed chunks into fewer console writes.
+
+    Chunks are buffered and written out once per FLUSH_INTERVAL, as soon as
+    FLUSH_SIZE characters are pending, or when flush() is called explicitly.
     """
-    request_id = str(uuid.uuid4())
-    
-    message = {
-        "id": request_id,
-        "type": "http_request",
-        "payload": {
-            "method": method,
-            "url": url,
-            "headers": {"Content-Type": ["application/json"]},
-            "body": json.dumps(body) if body else ""
-        }
-    }
-    
-    print(f"🔌 Connecting to {WS_URL}...")
-    
-    try:
-        async with websockets.connect(WS_URL) as ws:
-            print(f"✅ Connected! Sending request to {url}...")
-            
-            # Send the request
-            await ws.send(json.dumps(message))
-            
-            # Wait for response (handle streaming or single response)
+
+    def __init__(self):
+        self._parts = []
+        self._size = 0
+        self._timer = None
+
+    def write(self, chunk: str):
+        self._parts.append(chunk)
+        self._size += len(chunk)
+        if self._size >= FLUSH_SIZE:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(FLUSH_INTERVAL, self.flush)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._parts:
+            sys.stdout.write("".join(self._parts))
+            sys.stdout.flush()
+            self._parts.clear()
+            self._size = 0
+
+class BridgeClient:
+    """
+    Persistent client for the switchAILocal WebSocket relay.
+
+    Opens a single WebSocket and multiplexes requests over it by message id,
+    so consecutive requests skip the TCP handshake and HTTP upgrade.
+    """
+
+    def __init__(self, url: str = WS_URL):
+        self.url = url
+        self.ws = None
+        self._pending: dict[str, asyncio.Queue] = {}
+        self._reader = None
+
+    async def __aenter__(self):
+        print(f"🔌 Connecting to {self.url}...")
+        self.ws = await websockets.connect(self.url, ping_interval=20, max_size=2**22)
+        print("✅ Connected!")
+        self._reader = asyncio.create_task(self._read_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._reader.cancel()
+        try:
+            await self._reader
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.ws.close()
+
+    async def _read_loop(self):
+        """Dispatches incoming frames to the queue of the request they belong to."""
+        closed = ConnectionError("connection closed by server")
+        try:
+            async for response_raw in self.ws:
+                try:
+                    response = _loads(response_raw)
+                except ValueError:
+                    response = None
+                if not isinstance(response, dict):
+                    print(f"⚠️ Ignoring malformed frame: {response_raw!r}")
+                    continue
+                queue = self._pending.get(response.get("id"))
+                if queue is not None:
+                    queue.put_nowait(response)
+        except websockets.exceptions.ConnectionClosed as e:
+            closed = e
+        except Exception as e:
+            # Any other reader failure is delivered to the waiting requests too
+            print(f"❌ Reader stopped: {e}")
+            closed = e
+        finally:
+            # Wake up every request still waiting on this connection
+            for queue in self._pending.values():
+                queue.put_nowait(closed)
+
+    async def _receive(self, queue: asyncio.Queue):
+        """Consumes frames for one request (streaming or single response) until it completes."""
+        writer = _ChunkWriter()
+        try:
             while True:
-                response_raw = await asyncio.wait_for(ws.recv(), timeout=30)
-                response = json.loads(response_raw)
-                
+                response = await queue.get()
+                if isinstance(response, Exception):
+                    raise response
+
                 msg_type = response.get("type")
-                msg_id = response.get("id")
                 payload = response.get("payload", {})
-                
+                if msg_type != "stream_chunk":
+                    # Pending chunks must reach the console before anything else
+                    writer.flush()
+
                 if msg_type == "http_response":
                     print(f"📨 Response (Status: {payload.get('status', 'N/A')}):")
                     body = payload.get("body", "")
                     try:
-                        print(json.dumps(json.loads(body), indent=2))
+                        print(_dumps_pretty(_loads(body)))
                     except:
                         print(body)
                     return payload
-                    
+
                 elif msg_type == "stream_start":
                     print(f"📡 Stream started (Status: {payload.get('status', 200)})")
-                    
+
                 elif msg_type == "stream_chunk":
                     chunk = payload.get("data", "")
-                    print(chunk, end="", flush=True)
-                    
+                    writer.write(chunk)
+
                 elif msg_type == "stream_end":
                     print("\n📡 Stream ended.")
                     return None
-                    
+
                 elif msg_type == "error":
                     print(f"❌ Error: {payload.get('error', 'Unknown error')}")
                     return None
-                    
+
                 elif msg_type == "pong":
                     # Heartbeat response, ignore
                     continue
-                    
+
                 else:
                     print(f"⚠️ Unknown message type: {msg_type}")
-                    
-    except websockets.exceptions.ConnectionClosed as e:
-        print(f"❌ Connection closed: {e}")
-    except asyncio.TimeoutError:
-        print("❌ Timeout waiting for response")
+        finally:
+            writer.flush()
+
+    async def send(self, method: str, url: str, body: dict = None):
+        """
+        Sends an HTTP request through the relay and waits for its response.
+
+        Returns the response payload for non-streaming responses, None otherwise.
+        """
+        request_id = str(uuid.uuid4())
+
+        message = {
+            "id": request_id,
+            "type": "http_request",
+            "payload": {
+                "method": method,
+                "url": url,
+                "headers": {"Content-Type": ["application/json"]},
+                "body": _dumps(body) if body else ""
+            }
+        }
+
+        queue = asyncio.Queue()
+        self._pending[request_id] = queue
+
+        try:
+            print(f"📤 Sending request to {url}...")
+            await self.ws.send(_dumps(message))
+
+            # One deadline for the whole response rather than a timer per frame
+            return await asyncio.wait_for(self._receive(queue), timeout=REQUEST_TIMEOUT)
+
+        except websockets.exceptions.ConnectionClosed as e:
+            print(f"❌ Connection closed: {e}")
+        except asyncio.TimeoutError:
+            print("❌ Timeout waiting for response")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+        finally:
+            del self._pending[request_id]
+
+
+async def execute_http_request(method: str, url: str, body: dict = None):
+    """
+    Sends a single HTTP request through the switchAILocal WebSocket relay.
+
+    This demonstrates how agentic clients can use switchAILocal as a unified
+    gateway - sending requests through WebSocket instead of direct HTTP.
+    Use BridgeClient directly to send several requests over one connection.
+    """
+    try:
+        async with BridgeClient() as client:
+            return await client.send(method, url, body)
     except Exception as e:
         print(f"❌ Error: {e}")
 
@@ -105,7 +238,7 @@ async def main():
     
     if command == "models":
         # List available models via WebSocket
-        await execute_http_request("GET", "/v1/models")
+        request = ("GET", "/v1/models", None)
         
     elif command == "chat":
         if len(sys.argv) < 3:
@@ -118,11 +251,18 @@ async def main():
             "messages": [{"role": "user", "content": prompt}],
             "stream": False
         }
-        await execute_http_request("POST", "/v1/chat/completions", body)
+        request = ("POST", "/v1/chat/completions", body)
         
     else:
         print(f"Unknown command: {command}")
         print("Available commands: models, chat")
+        return
+
+    try:
+        async with BridgeClient() as client:
+            await client.send(*request)
+    except Exception as e:
+        print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
     asyncio.run(main())
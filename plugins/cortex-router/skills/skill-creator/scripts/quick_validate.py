@@ -3,8 +3,12 @@
 Quick validation script for skills - validates structure and content quality
 """
 
+import os
 import sys
 import re
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 try:
@@ -13,6 +17,12 @@ except ImportError:
     print("Error: PyYAML not installed. Run: pip install pyyaml")
     sys.exit(1)
 
+# Prefer the libyaml-backed loader; PyYAML falls back to pure Python without it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 # Valid capability values
 VALID_CAPABILITIES = {
@@ -23,61 +33,75 @@ VALID_CAPABILITIES = {
 # Allowed frontmatter properties
 ALLOWED_PROPERTIES = {'name', 'description', 'required-capability', 'allowed-tools', 'metadata'}
 
+# Precompiled patterns and precomputed option lists for error messages
+_KEBAB_RE = re.compile(r'^[a-z0-9]+(-[a-z0-9]+)*$')
+_TODO_RE = re.compile(r'\[TODO|TODO:')
+_ALLOWED_SORTED = ', '.join(sorted(ALLOWED_PROPERTIES))
+_CAPS_SORTED = ', '.join(sorted(VALID_CAPABILITIES))
 
-def validate_skill(skill_path):
+# Characters str.strip() removes from ASCII text
+_ASCII_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+# Content check results, keyed by (directory name, SHA-256 of SKILL.md)
+_VALIDATION_CACHE = {}
+
+
+@lru_cache(maxsize=256)
+def _load_frontmatter(frontmatter_text):
+    """Parse YAML frontmatter, memoized since parsing dominates validation cost."""
+    return yaml.load(frontmatter_text, Loader=_YamlLoader)
+
+
+def _validate_content(raw, dir_name):
     """
-    Validate a skill directory.
-    
+    Validate raw SKILL.md bytes against the frontmatter and body rules.
+
+    Only the frontmatter is decoded up front; the body is checked as bytes
+    and decoded only when it contains non-ASCII characters.
+
     Returns:
-        tuple: (is_valid: bool, message: str)
+        tuple: (is_valid: bool, error message or list of warnings)
     """
-    skill_path = Path(skill_path)
     warnings = []
 
-    # Check directory exists
-    if not skill_path.exists():
-        return False, f"Skill directory not found: {skill_path}"
-    
-    if not skill_path.is_dir():
-        return False, f"Path is not a directory: {skill_path}"
-
-    # Check SKILL.md exists
-    skill_md = skill_path / 'SKILL.md'
-    if not skill_md.exists():
-        return False, "SKILL.md not found"
-
-    # Read content
-    try:
-        content = skill_md.read_text(encoding='utf-8')
-    except Exception as e:
-        return False, f"Failed to read SKILL.md: {e}"
+    # Universal newlines, as read_text() would apply (\r never occurs inside UTF-8 sequences)
+    if b'\r' in raw:
+        raw = raw.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
 
     # Check frontmatter exists
-    if not content.startswith('---'):
+    if not raw.startswith(b'---'):
         return False, "No YAML frontmatter found (must start with ---)"
 
     # Extract frontmatter
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if not match:
+    end = raw.find(b'\n---', 4) if raw.startswith(b'---\n') else -1
+    if end == -1:
         return False, "Invalid frontmatter format (missing closing ---)"
 
-    frontmatter_text = match.group(1)
-    body = content[match.end():].strip()
+    frontmatter_text = raw[4:end].decode('utf-8')
+    body = raw[end + 4:]
+    if body.isascii():
+        body = body.strip(_ASCII_WHITESPACE)
+        body_len = len(body)
+    else:
+        # Decoding validates UTF-8 and lets the length check count characters
+        text = body.decode('utf-8').strip()
+        body_len = len(text)
+        body = text.encode('utf-8')
 
     # Parse YAML frontmatter
     try:
-        frontmatter = yaml.safe_load(frontmatter_text)
+        frontmatter = _load_frontmatter(frontmatter_text)
         if not isinstance(frontmatter, dict):
             return False, "Frontmatter must be a YAML dictionary"
     except yaml.YAMLError as e:
         return False, f"Invalid YAML in frontmatter: {e}"
 
     # Check for unexpected properties
-    unexpected_keys = set(frontmatter.keys()) - ALLOWED_PROPERTIES
+    unexpected_keys = frontmatter.keys() - ALLOWED_PROPERTIES
     if unexpected_keys:
         return False, (
             f"Unexpected key(s) in frontmatter: {', '.join(sorted(unexpected_keys))}. "
-            f"Allowed: {', '.join(sorted(ALLOWED_PROPERTIES))}"
+            f"Allowed: {_ALLOWED_SORTED}"
         )
 
     # Validate 'name' field
@@ -93,15 +117,15 @@ def validate_skill(skill_path):
         return False, "Name cannot be empty"
     
     # Check naming convention (kebab-case)
-    if not re.match(r'^[a-z0-9]+(-[a-z0-9]+)*$', name):
+    if not _KEBAB_RE.match(name):
         return False, f"Name '{name}' must be kebab-case (lowercase letters, digits, hyphens)"
     
     if len(name) > 64:
         return False, f"Name too long ({len(name)} chars). Maximum is 64."
 
     # Check name matches directory
-    if name != skill_path.name:
-        warnings.append(f"Name '{name}' doesn't match directory '{skill_path.name}'")
+    if name != dir_name:
+        warnings.append(f"Name '{name}' doesn't match directory '{dir_name}'")
 
     # Validate 'description' field
     if 'description' not in frontmatter:
@@ -125,7 +149,7 @@ def validate_skill(skill_path):
         return False, "Description cannot contain angle brackets (< or >)"
 
     # Check for TODO placeholders
-    if '[TODO' in description or 'TODO:' in description:
+    if _TODO_RE.search(description):
         return False, "Description contains TODO placeholder - please complete it"
 
     # Validate 'required-capability' if present
@@ -136,41 +160,96 @@ def validate_skill(skill_path):
         if capability not in VALID_CAPABILITIES:
             return False, (
                 f"Invalid required-capability '{capability}'. "
-                f"Valid options: {', '.join(sorted(VALID_CAPABILITIES))}"
+                f"Valid options: {_CAPS_SORTED}"
             )
 
     # Validate body content
     if not body:
         return False, "SKILL.md body is empty"
     
-    if len(body) < 50:
+    if body_len < 50:
         warnings.append("SKILL.md body is very short. Consider adding more guidance.")
     
     # Check for TODO placeholders in body
-    if '[TODO' in body:
+    if b'[TODO' in body:
         warnings.append("Body contains [TODO] placeholders - consider completing them")
 
     # Check body length (warn if too long)
-    body_lines = body.count('\n') + 1
+    body_lines = body.count(b'\n') + 1
     if body_lines > 500:
         warnings.append(f"SKILL.md is {body_lines} lines. Consider splitting into references/")
 
+    return True, warnings
+
+
+def validate_skill(skill_path):
+    """
+    Validate a skill directory.
+    
+    Returns:
+        tuple: (is_valid: bool, message: str)
+    """
+    skill_path = Path(skill_path)
+    warnings = []
+
+    # Check directory exists
+    if not skill_path.exists():
+        return False, f"Skill directory not found: {skill_path}"
+    
+    if not skill_path.is_dir():
+        return False, f"Path is not a directory: {skill_path}"
+
+    # Check SKILL.md exists
+    skill_md = skill_path / 'SKILL.md'
+    if not skill_md.exists():
+        return False, "SKILL.md not found"
+
+    # Read content
+    try:
+        raw = skill_md.read_bytes()
+    except Exception as e:
+        return False, f"Failed to read SKILL.md: {e}"
+
+    # Skip the content checks entirely for an unchanged SKILL.md
+    key = (skill_path.name, hashlib.sha256(raw).hexdigest())
+    cached = _VALIDATION_CACHE.get(key)
+    if cached is None:
+        try:
+            cached = _validate_content(raw, skill_path.name)
+        except UnicodeDecodeError:
+            # The error positions are relative to the decoded slice (and the
+            # newline-normalized bytes); decoding the whole file again reports
+            # the same first bad byte at its offset in SKILL.md
+            try:
+                raw.decode('utf-8')
+            except UnicodeDecodeError as e:
+                return False, f"Failed to read SKILL.md: {e}"
+            raise
+        _VALIDATION_CACHE[key] = cached
+
+    valid, detail = cached
+    if not valid:
+        return False, detail
+    warnings.extend(detail)
+
+    # List the skill directory once instead of stat()ing each candidate
+    with os.scandir(skill_path) as it:
+        entries = {entry.name: entry for entry in it}
+
     # Check for unnecessary files
     unnecessary_files = ['README.md', 'CHANGELOG.md', 'INSTALLATION.md', 'QUICK_REFERENCE.md']
     for filename in unnecessary_files:
-        if (skill_path / filename).exists():
+        if filename in entries:
             warnings.append(f"Unnecessary file found: {filename}")
 
-    # Check resource directories
-    scripts_dir = skill_path / 'scripts'
-    references_dir = skill_path / 'references'
-    assets_dir = skill_path / 'assets'
-
-    # Warn about empty directories
-    for dir_path, dir_name in [(scripts_dir, 'scripts'), (references_dir, 'references'), (assets_dir, 'assets')]:
-        if dir_path.exists() and dir_path.is_dir():
-            files = list(dir_path.iterdir())
-            if not files:
+    # Warn about empty resource directories
+    for dir_name in ('scripts', 'references', 'assets'):
+        entry = entries.get(dir_name)
+        if entry is not None and entry.is_dir():
+            # Stop at the first entry rather than listing the whole directory
+            with os.scandir(entry.path) as it:
+                empty = next(it, None) is None
+            if empty:
                 warnings.append(f"Empty directory: {dir_name}/ - consider removing if not needed")
 
     # Build result message
@@ -181,9 +260,54 @@ def validate_skill(skill_path):
     return True, "Skill is valid!"
 
 
+def validate_skills(skill_paths, max_workers=None):
+    """
+    Validate several skill directories in parallel.
+
+    Validation is CPU-bound (YAML parsing, regexes), so skills are spread
+    over worker processes rather than threads.
+
+    Returns:
+        list: (skill_path, (is_valid: bool, message: str)) in input order
+    """
+    skill_paths = list(skill_paths)
+    if len(skill_paths) <= 1:
+        return [(path, validate_skill(path)) for path in skill_paths]
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        # Batches of 8 amortize the pickling round-trip per task
+        results = executor.map(validate_skill, skill_paths, chunksize=8)
+        return list(zip(skill_paths, results))
+
+
+def validate_all(skills_root):
+    """Validate every skill directory under skills_root and print a summary."""
+    root = Path(skills_root)
+    if not root.is_dir():
+        print(f"❌ Path is not a directory: {root}")
+        return False
+
+    skill_paths = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith('.'))
+    print(f"Validating {len(skill_paths)} skills in: {root}\n")
+
+    failed = 0
+    for path, (valid, message) in validate_skills(skill_paths):
+        if valid:
+            print(f"✅ {path.name}: {message}")
+        else:
+            failed += 1
+            print(f"❌ {path.name}: {message}")
+
+    print(f"\n{len(skill_paths) - failed} valid, {failed} invalid")
+    return failed == 0
+
+
 def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--all':
+        sys.exit(0 if validate_all(sys.argv[2]) else 1)
+
     if len(sys.argv) != 2:
         print("Usage: python quick_validate.py <skill_directory>")
+        print("       python quick_validate.py --all <skills_root>")
         print("\nValidates a skill directory for:")
         print("  - SKILL.md presence and format")
         print("  - Frontmatter structure (name, description, required-capability)")
@@ -1,10 +1,267 @@
 
-import subprocess
+import asyncio
+import hashlib
 import json
 import re
 import os
+import shlex
 
-def run_curl(cmd):
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Maximum number of curls in flight at once
+CONCURRENCY = 16
+
+_ASSIGN_RE = re.compile(r'^[A-Za-z_]\w*=')
+_NAME_RE = re.compile(r'\{([A-Za-z_]\w*)\}|([A-Za-z_]\w*)')
+
+# Unquoted characters that would need a real shell (pipes, lists, redirects,
+# subshells, brace expansion)
+_SHELL_OPERATORS = set('|&;<>()`{}')
+# $ followed by one of these is a special or positional parameter
+_SPECIAL_PARAMS = set('$?!#@*-0123456789')
+
+def _expand_lines(script, variables):
+    """
+    Yields the logical command lines of a snippet, expanded like sh would.
+
+    Quoting is tracked across the whole snippet: newlines inside quotes stay
+    in the argument, backslash-newline continues a line, # starts a comment
+    only at the beginning of a word, and $NAME / ${NAME} expand outside
+    single quotes (from variables, then the environment). Expanded values are
+    re-quoted so shlex sees them as sh would. Anything not modelled here
+    (operators, command substitution, ${...} forms other than ${NAME},
+    special parameters, tilde and brace expansion) raises ValueError.
+    """
+    out, quote, i, n = [], None, 0, len(script)
+    while i < n:
+        c = script[i]
+        if quote == "'":
+            if c == "'":
+                quote = None
+            out.append(c)
+            i += 1
+            continue
+        if c == "\\" and i + 1 < n:
+            nxt = script[i + 1]
+            if nxt == "\n":
+                pass  # line continuation
+            elif quote == '"' and nxt in "$`":
+                out.append(nxt)  # shlex would keep the backslash here
+            else:
+                out.append(c + nxt)
+            i += 2
+            continue
+        if c == "$":
+            nxt = script[i + 1:i + 2]
+            if nxt == "(":
+                raise ValueError("command substitution is not supported")
+            if nxt in _SPECIAL_PARAMS or (quote is None and nxt in "'\""):
+                raise ValueError(f"unsupported shell syntax: ${nxt}")
+            m = _NAME_RE.match(script, i + 1)
+            if nxt == "{" and m is None:
+                raise ValueError("only ${NAME} parameter expansion is supported")
+            if m:
+                name = m.group(1) or m.group(2)
+                value = variables.get(name, os.environ.get(name, ""))
+                if not value:
+                    pass
+                elif quote == '"':
+                    out.append(value.replace("\\", "\\\\").replace('"', '\\"'))
+                else:
+                    # Unquoted expansions are word-split
+                    out.append(" ".join(shlex.quote(word) for word in value.split()))
+                i = m.end()
+                continue
+        elif quote == '"':
+            if c == '"':
+                quote = None
+            elif c == "`":
+                raise ValueError("command substitution is not supported")
+        elif c in "'\"":
+            quote = c
+        elif c == "#" and (not out or out[-1][-1] in " \t"):
+            end = script.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif c == "~" and (not out or out[-1][-1] in " \t=:"):
+            raise ValueError("tilde expansion is not supported")
+        elif c == "\n":
+            yield "".join(out)
+            out = []
+            i += 1
+            continue
+        elif c in _SHELL_OPERATORS:
+            raise ValueError(f"unsupported shell syntax: {c!r}")
+        out.append(c)
+        i += 1
+    if quote:
+        raise ValueError("No closing quotation")
+    yield "".join(out)
+
+def split_commands(script):
+    """
+    Splits a shell snippet into argv lists so it can run without /bin/sh.
+
+    Covers what the documented examples use: comments, backslash line
+    continuations, quoted multi-line arguments, and NAME=value lines whose
+    $NAME references are expanded in later commands. Raises ValueError for
+    shell syntax beyond that, so the caller can hand the snippet to sh.
+    """
+    commands = []
+    variables = {}
+    # The generator is lazy, so each line sees the assignments made before it
+    for line in _expand_lines(script, variables):
+        argv = shlex.split(line)
+        if argv and _ASSIGN_RE.match(argv[0]):
+            if len(argv) > 1:
+                raise ValueError("per-command variable assignments are not supported")
+            name, value = argv[0].split("=", 1)
+            variables[name] = value
+        elif argv:
+            commands.append(argv)
+    return commands
+
+def parse_curl(argv):
+    """
+    Parses a curl argv into (method, url, headers, data, auth).
+
+    Returns None when the command uses anything beyond -X, -H, -d and -u
+    (plus output-only flags), so the caller can fall back to real curl.
+    """
+    if not argv or argv[0] != "curl":
+        return None
+    method, url, headers, data, auth = None, None, {}, [], None
+    args = iter(argv[1:])
+    try:
+        for arg in args:
+            if arg in ("-X", "--request"):
+                method = next(args)
+            elif arg in ("-H", "--header"):
+                name, _, value = next(args).partition(":")
+                headers[name.strip()] = value.strip()
+            elif arg in ("-d", "--data", "--data-raw"):
+                value = next(args)
+                if value.startswith("@") and arg != "--data-raw":
+                    return None  # body read from a file
+                data.append(value)
+            elif arg in ("-u", "--user"):
+                user, _, password = next(args).partition(":")
+                auth = (user, password)
+            elif arg in ("-s", "--silent", "-N", "--no-buffer"):
+                continue
+            elif arg.startswith("-") or url is not None:
+                return None
+            else:
+                url = arg
+    except StopIteration:
+        return None
+    if url is None:
+        return None
+    body = "&".join(data) if data else None
+    if body is not None:
+        # curl's default for -d, unless the user set one (header names are case-insensitive)
+        if not any(name.lower() == "content-type" for name in headers):
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+    return method or ("POST" if body is not None else "GET"), url, headers, body, auth
+
+def new_client():
+    """
+    Creates the shared client curls are replayed on, or None without httpx.
+
+    HTTP/2 (when h2 is installed) multiplexes requests over one connection
+    to https endpoints; plain http falls back to HTTP/1.1 keep-alive.
+    """
+    if httpx is None:
+        return None
+    return httpx.AsyncClient(
+        http2=_HTTP2,
+        timeout=15,
+        limits=httpx.Limits(max_keepalive_connections=CONCURRENCY, max_connections=2 * CONCURRENCY),
+    )
+
+async def _replay_curl(client, request):
+    """Issues a parsed curl request on the shared client, mimicking curl's exit codes."""
+    method, url, headers, body, auth = request
+    try:
+        resp = await client.request(method, url, headers=headers, content=body, auth=auth)
+    except httpx.TimeoutException as e:
+        return 28, "", f"curl: (28) {e}\n"
+    except httpx.TransportError as e:
+        return 7, "", f"curl: (7) {e}\n"
+    except httpx.HTTPError as e:
+        return 1, "", f"curl: {e}\n"
+    return 0, resp.content.decode(errors="replace"), ""
+
+def command_key(cmd):
+    """
+    Returns a SHA-256 digest identifying what a snippet executes.
+
+    Hashes the parsed argv lists rather than the raw text, so snippets that
+    differ only in comments or line wrapping map to the same key.
+    """
+    try:
+        canonical = repr(split_commands(cmd))
+    except ValueError:
+        canonical = cmd
+    return hashlib.sha256(canonical.encode()).digest()
+
+async def _communicate(proc):
+    """Collects a process's exit status and output, killing it if we are cancelled (timeout)."""
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+async def _exec_shell(cmd):
+    """Runs a snippet through /bin/sh, for syntax split_commands does not handle."""
+    proc = await asyncio.create_subprocess_shell(
+        cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    return await _communicate(proc)
+
+async def _exec_commands(commands, client):
+    """Runs argv lists in sequence; like a shell, the last exit status wins."""
+    code, out, err = 0, [], []
+    for argv in commands:
+        request = parse_curl(argv) if client is not None else None
+        if request is not None:
+            # No process at all: the request shares the client's connections
+            code, stdout, stderr = await _replay_curl(client, request)
+            out.append(stdout)
+            err.append(stderr)
+            continue
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            code = 127
+            err.append(f"{argv[0]}: command not found\n")
+            continue
+        code, stdout, stderr = await _communicate(proc)
+        out.append(stdout)
+        err.append(stderr)
+    return code, "".join(out), "".join(err)
+
+async def run_curl(cmd, client=None):
     # Prepare the command:
     # 1. Handle management key
     cmd = cmd.replace("your-secret-key", "your-secret-key")
@@ -18,44 +275,111 @@ def run_curl(cmd):
         cmd = re.sub(r'IMAGE_DATA=.*?\n', f'IMAGE_DATA="{dummy_base64}"\n', cmd)
 
     try:
+        # Replay curls in-process (or exec them) instead of forking /bin/sh
+        try:
+            run = _exec_commands(split_commands(cmd), client)
+        except ValueError:
+            # Shell syntax the splitter does not model: let sh run this block
+            run = _exec_shell(cmd)
         # Use a 15-second timeout
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=15)
-        return result.returncode, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
+        return await asyncio.wait_for(run, timeout=15)
+    except asyncio.TimeoutError:
         return -2, "", "Timeout: Request took longer than 15s"
     except Exception as e:
         return -1, "", str(e)
 
+def _find_closing_fence(text, start):
+    """Returns (body_end, resume) for the first closing ``` fence after start, or None."""
+    i = text.find("```", start)
+    while i != -1:
+        line_start = text.rfind("\n", start, i) + 1
+        eol = text.find("\n", i)
+        if eol == -1:
+            eol = len(text)
+        # A closing fence sits alone on its line (```python inside a block is content)
+        if not text[line_start:i].strip(" \t") and not text[i:eol].strip("` \t\r"):
+            return line_start - 1, eol
+        i = text.find("```", eol)
+    return None
+
+def _iter_fenced_spans(text, lang_whitelist):
+    """
+    Yields (lang, start, end) body bounds for each fenced block whose info string is in lang_whitelist.
+
+    Walks the text once, jumping between fences with str.find. Only backticks
+    that open a line count as a fence, so ``` inside quoted strings or inline
+    code is ignored, and non-whitelisted blocks are skipped as a whole.
+    """
+    i = text.find("```")
+    while i != -1:
+        line_start = text.rfind("\n", 0, i) + 1
+        if text[line_start:i].strip(" \t"):
+            i = text.find("```", i + 3)
+            continue
+        eol = text.find("\n", i)
+        if eol == -1:
+            return
+        fence = _find_closing_fence(text, eol)
+        if fence is None:
+            return
+        body_end, resume = fence
+        lang = text[i + 3:eol].strip().lower()
+        if lang in lang_whitelist:
+            yield lang, eol + 1, body_end
+        i = text.find("```", resume)
+
 def extract_curls(file_path):
     with open(file_path, 'r') as f:
         content = f.read()
     
-    # Simple regex to find bash code blocks
-    blocks = re.findall(r'```bash\n(.*?)\n```', content, re.DOTALL)
+    # Single-pass scan for bash code blocks
     curls = []
-    for b in blocks:
-        if 'curl' in b:
-            curls.append(b.strip())
+    for _, start, end in _iter_fenced_spans(content, ("bash",)):
+        # Search within the bounds so non-curl blocks are never sliced out
+        if content.find('curl', start, end) != -1:
+            curls.append(content[start:end].strip())
     return curls
 
-def main():
+async def main():
     examples_path = "/Users/sebastian/Projects/makakoo/agents/switchAILocal/docs/user/examples.md"
     curls = extract_curls(examples_path)
     
-    report = "# Example Curl Audit (AUDIT1)\n\n"
-    report += "This audit provides a real-world verification of all examples documented in `docs/user/examples.md`.\n\n"
-    report += "| # | Request | Status | Result | Notes |\n"
-    report += "|---|---------|--------|--------|-------|\n"
+    # Collect report chunks and join once; repeated str += copies the whole report
+    report = ["# Example Curl Audit (AUDIT1)\n\n"]
+    report.append("This audit provides a real-world verification of all examples documented in `docs/user/examples.md`.\n\n")
+    report.append("| # | Request | Status | Result | Notes |\n")
+    report.append("|---|---------|--------|--------|-------|\n")
     
-    for i, cmd in enumerate(curls):
-        print(f"Running curl {i+1}/{len(curls)}...")
-        
+    # Fan out all curls with bounded concurrency; gather keeps the original order
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    client = new_client()
+
+    async def guarded(i, cmd):
+        async with sem:
+            print(f"Running curl {i+1}/{len(curls)}...")
+            return await run_curl(cmd, client)
+
+    # Identical commands share one run (and its result) instead of repeating the request
+    runs = {}
+
+    def run_once(i, cmd):
+        key = command_key(cmd)
+        if key not in runs:
+            runs[key] = asyncio.ensure_future(guarded(i, cmd))
+        return runs[key]
+
+    try:
+        results = await asyncio.gather(*(run_once(i, cmd) for i, cmd in enumerate(curls)))
+    finally:
+        if client is not None:
+            await client.aclose()
+
+    for i, (cmd, (code, stdout, stderr)) in enumerate(zip(curls, results)):
         # Clean up the command for display
         first_line = cmd.split('\n')[0]
         display_cmd = (first_line[:50] + "...") if len(first_line) > 50 else first_line
         
-        code, stdout, stderr = run_curl(cmd)
-        
         status = "✅ PASS"
         notes = "-"
         
@@ -69,7 +393,7 @@ def main():
                 notes = stderr[:100]
         else:
             try:
-                data = json.loads(stdout)
+                data = _loads(stdout)
                 if "error" in data or data.get("success") == False:
                     status = "⚠️ APP ERROR"
                     result_summary = data.get("error") or data.get("message") or "Error response"
@@ -81,21 +405,21 @@ def main():
                 else:
                     result_summary = "200 OK (Empty Body)"
 
-        report += f"| {i+1} | `{display_cmd}` | {status} | {result_summary} | {notes} |\n"
+        report.append(f"| {i+1} | `{display_cmd}` | {status} | {result_summary} | {notes} |\n")
         
         # Detail section
-        report += f"\n### [{i+1}] {display_cmd}\n"
-        report += f"**Command:**\n```bash\n{cmd}\n```\n"
+        report.append(f"\n### [{i+1}] {display_cmd}\n")
+        report.append(f"**Command:**\n```bash\n{cmd}\n```\n")
         if stdout:
-            report += f"**Response stdout:**\n```json\n{stdout}\n```\n"
+            report.append(f"**Response stdout:**\n```json\n{stdout}\n```\n")
         if stderr:
-             report += f"**Response stderr:**\n```\n{stderr}\n```\n"
-        report += "\n---\n"
+             report.append(f"**Response stderr:**\n```\n{stderr}\n```\n")
+        report.append("\n---\n")
 
     audit_path = "/Users/sebastian/.gemini/antigravity/brain/c362752a-d55b-4b4b-aefd-c8262e40767b/AUDIT1.md"
     with open(audit_path, "w") as f:
-        f.write(report)
+        f.write("".join(report))
     print(f"Audit report generated at: {audit_path}")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())